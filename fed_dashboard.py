@@ -3,9 +3,19 @@ import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
-from datetime import datetime, timedelta
-from plotly.subplots import make_subplots
+import plotly.io as pio
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Serialize figures with orjson - much faster than the stdlib encoder for datetime-heavy traces
+pio.json.config.default_engine = 'orjson'
 
 # Set up the page
 st.set_page_config(page_title="Fed Balance Sheet Dashboard", layout="wide")
@@ -65,6 +75,11 @@ FRED_SERIES = {
     "Other Assets": "WAOAL",  # Assets: Other: Other Assets, Consolidated Table: Wednesday Level 
 }
 
+# Component names and the default selection, as fixed tuples
+FRED_COMPONENTS = tuple(FRED_SERIES)
+DEFAULT_SELECTION = ("Total Assets", "Treasury Securities", "Mortgage-Backed Securities", "Bank Reserves", 
+                     "Reverse Repo Foreign", "Central Bank Liquidity Swaps", "Loans", "Securities in Custody")
+
 # Asset selection with tooltips
 st.sidebar.markdown("**Select Components to Display:**")
 with st.sidebar.expander("ℹ️ What each component means"):
@@ -83,86 +98,453 @@ with st.sidebar.expander("ℹ️ What each component means"):
 
 selected_assets = st.sidebar.multiselect(
     "Balance Sheet Components",
-    list(FRED_SERIES.keys()),
-    default=["Total Assets", "Treasury Securities", "Mortgage-Backed Securities", "Bank Reserves", 
-             "Reverse Repo Foreign", "Central Bank Liquidity Swaps", "Loans", "Securities in Custody"]
+    FRED_COMPONENTS,
+    default=DEFAULT_SELECTION
 )
 
+# Upper bound on concurrent FRED requests (one connection per worker)
+MAX_FETCH_WORKERS = 16
+
+# Shared HTTP session so parallel fetches reuse TCP/TLS connections (keep-alive + gzip)
+# Held in st.cache_resource so the connection pool survives script reruns
+@st.cache_resource
+def get_session():
+    """Create the pooled HTTP session used for all FRED requests"""
+    session = requests.Session()
+    session.headers.update({"Accept-Encoding": "gzip"})
+    # Retry rate limiting and transient server errors up to 3 times with exponential backoff
+    retry = Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+    session.mount("https://", HTTPAdapter(max_retries=retry, pool_maxsize=MAX_FETCH_WORKERS))
+    return session
+
+SESSION = get_session()
+
+# On-disk cache of fetched series, so a server restart doesn't refetch everything.
+# One file per series holding the widest history fetched so far. It is shared by all API keys -
+# FRED serves the same public data to every key - but a key is checked with FRED before it's served
+CACHE_DIR = Path.home() / ".cache" / "fed_dashboard"
+
+# Function to find when the cached data was last superseded
+def last_release_ts():
+    """Timestamp of the most recent H.4.1 release (Thursdays ~4:30pm ET, taken as 22:00 UTC)"""
+    now = datetime.now(timezone.utc)
+    release = (now - timedelta(days=(now.weekday() - 3) % 7)).replace(hour=22, minute=0, second=0, microsecond=0)
+    if release > now:
+        release -= timedelta(days=7)
+    return release.timestamp()
+
+# Function to tell transient FRED failures from ones a retry won't fix
+def is_transient_error(exc):
+    """True for network errors, timeouts, exhausted retries and 429/5xx responses"""
+    if isinstance(exc, (requests.ConnectionError, requests.Timeout, requests.exceptions.RetryError)):
+        return True
+    if isinstance(exc, requests.HTTPError) and exc.response is not None:
+        return exc.response.status_code == 429 or exc.response.status_code >= 500
+    return False
+
+# Function to confirm an API key with FRED before serving it data from the disk cache
+# Cached per key, so it's one cheap request per key per hour; rejected keys raise and aren't cached
+@st.cache_data(ttl=3600, show_spinner=False, max_entries=16)
+def check_api_key(api_key, _session):
+    """Raise requests.HTTPError if FRED rejects the API key"""
+    response = _session.get(
+        "https://api.stlouisfed.org/fred/series",
+        params={"series_id": "WALCL", "api_key": api_key, "file_type": "json"},
+        timeout=(3, 10)
+    )
+    response.raise_for_status()
+    return True
+
+# Raised by fetch_fred_data when FRED is unreachable and older data from disk is served instead,
+# so the stale result isn't cached and the next rerun tries FRED again
+class StaleDataError(Exception):
+    """Carries the cached series and when it was written to disk"""
+    def __init__(self, series, cached_on):
+        super().__init__(f"FRED unreachable, using data cached on {cached_on:%Y-%m-%d}")
+        self.series = series
+        self.cached_on = cached_on
+
 # Function to fetch data from FRED
-def fetch_fred_data(series_id, api_key, start_date):
+# Cached per (series_id, api_key, start_date) - FRED only updates weekly, so reruns skip the network.
+# Failures raise instead of returning None: Streamlit doesn't cache exceptions, so the next rerun retries
+@st.cache_data(ttl=3600, show_spinner=False, max_entries=64)
+def fetch_fred_data(series_id, api_key, start_date, _session):
     """Fetch data from FRED API"""
     if not api_key or api_key.strip() == "":
-        return None
+        raise ValueError("No FRED API key")
+    
+    cache_path = CACHE_DIR / f"{series_id}.parquet"
+    requested_start = pd.Timestamp(start_date)
+    cached = None
+    if cache_path.exists():
+        try:
+            frame = pd.read_parquet(cache_path)
+            # observation_start the file was fetched from - the series itself may begin later
+            cached_start = pd.Timestamp(frame.attrs.get('observation_start', frame.index.min()))
+            if requested_start >= cached_start:
+                cached = frame[series_id]
+                cached.attrs = {}
+        except (OSError, ValueError, KeyError, ImportError):
+            pass  # Unreadable/corrupt cache file or no Parquet engine - refetch in full
+    
+    # Serve from disk if the file covers the range and was written after the latest weekly release.
+    # No observations request is sent then, so the key is checked separately -
+    # unless FRED is unreachable, when the file is still the latest data there is
+    if cached is not None and cache_path.stat().st_mtime > last_release_ts():
+        try:
+            check_api_key(api_key, _session)
+        except requests.RequestException as e:
+            if not is_transient_error(e):
+                raise
+        return cached.loc[requested_start:]
+    
+    # Otherwise only ask FRED for observations from the last cached one on
+    # (refetching that row picks up any revision to the latest week)
+    observation_start = requested_start
+    if cached is not None and not cached.empty:
+        observation_start = cached.index.max()
         
     url = f"https://api.stlouisfed.org/fred/series/observations"
     params = {
         "series_id": series_id,
         "api_key": api_key,
         "file_type": "json",
-        "observation_start": start_date.strftime("%Y-%m-%d"),
+        "observation_start": observation_start.strftime("%Y-%m-%d"),
         "frequency": "w",
         "units": "lin"
     }
     
     try:
-        response = requests.get(url, params=params)
+        response = _session.get(url, params=params, timeout=(3, 10))  # (connect, read) seconds
         response.raise_for_status()
-        data = response.json()
+        data = orjson.loads(response.content)
         
-        observations = data.get('observations', [])
-        if not observations:
-            return None
+        # Keep only real observations - FRED marks missing values with '.'
+        observations = [o for o in data.get('observations', []) if o['value'] != '.']
+        if observations:
+            # Build typed arrays directly (float32 - ample precision, half the memory)
+            dates = np.array([o['date'] for o in observations], dtype='datetime64[D]')
+            values = np.fromiter((float(o['value']) for o in observations), dtype=np.float32, count=len(observations))
             
-        df = pd.DataFrame(observations)
-        df['value'] = pd.to_numeric(df['value'], errors='coerce')
-        df['date'] = pd.to_datetime(df['date'])
-        df = df.dropna(subset=['value'])
+            series = pd.Series(values, index=pd.DatetimeIndex(dates, name='date'), name=series_id)
+            if cached is not None:
+                # Fresh rows win where FRED's weekly aggregation overlaps the cached ones
+                series = pd.concat([cached, series])
+                series = series[~series.index.duplicated(keep='last')].sort_index()
+        elif cached is not None:
+            series = cached  # Nothing new since the last fetch
+        else:
+            raise ValueError(f"FRED returned no observations for {series_id}")
         
-        if len(df) == 0:
-            return None
-            
-        return df[['date', 'value']].rename(columns={'value': series_id})
+        # Rewriting also refreshes the mtime, marking the file current for this release.
+        # Written to a temp file and swapped in, as other sessions/threads may read or write it concurrently
+        try:
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            frame = series.to_frame()
+            frame.attrs['observation_start'] = (cached_start if cached is not None else requested_start).isoformat()
+            fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix='.tmp')
+            os.close(fd)
+            try:
+                frame.to_parquet(tmp_path, compression='zstd')
+                os.replace(tmp_path, cache_path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+        except (OSError, ValueError, ImportError):
+            pass  # The disk cache is best-effort (unwritable directory, no Parquet engine)
         
-    except Exception as e:
-        return None
+        return series.loc[requested_start:]
+        
+    except (requests.RequestException, ValueError, KeyError) as e:
+        # Network/HTTP failure or a malformed payload (orjson errors are ValueErrors).
+        # Stale data from disk beats no data while FRED is unreachable, but a rejected key
+        # or a bad payload won't fix itself on retry, so those still fail the series
+        if cached is None or not is_transient_error(e):
+            raise
+        raise StaleDataError(cached.loc[requested_start:], datetime.fromtimestamp(cache_path.stat().st_mtime)) from e
 
-# Fetch data
-with st.spinner("Fetching data from FRED..."):
+# Raised by build_display_data when some series failed or are stale, so the result isn't cached
+class PartialFetchError(Exception):
+    """Carries the display_data (None if nothing loaded), failed_assets and stale_assets of an incomplete fetch"""
+    def __init__(self, display_data, failed_assets, stale_assets):
+        super().__init__(f"Could not fetch {', '.join(failed_assets + list(stale_assets))}")
+        self.display_data = display_data
+        self.failed_assets = failed_assets
+        self.stale_assets = stale_assets
+
+# Function to fetch, merge and convert the selected series
+# Cached so that widget interactions (tabs, selectboxes) don't redo the merge
+@st.cache_data(ttl=3600, show_spinner=False, max_entries=16)
+def build_display_data(assets, start_date, api_key):
+    """Return display_data for the selected components, raising PartialFetchError if any failed or are stale"""
     all_data = []
-    successful_fetches = 0
-    
-    for asset_name in selected_assets:
-        series_id = FRED_SERIES[asset_name]
-        df = fetch_fred_data(series_id, api_key, start_date)
-        if df is not None and not df.empty:
-            all_data.append(df)
-            successful_fetches += 1
+    failed_assets = []
+    stale_assets = {}
+    
+    # Fetch each distinct series once, in parallel - the requests are network-bound
+    series_ids = list(dict.fromkeys(FRED_SERIES[asset_name] for asset_name in assets))
+    results = {}
+    cached_on = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(len(series_ids), MAX_FETCH_WORKERS))) as executor:
+        futures = {
+            executor.submit(fetch_fred_data, series_id, api_key, start_date, SESSION): series_id
+            for series_id in series_ids
+        }
+        for future in as_completed(futures):
+            try:
+                results[futures[future]] = future.result()
+            except StaleDataError as e:
+                results[futures[future]] = e.series
+                cached_on[futures[future]] = e.cached_on
+            except (requests.RequestException, ValueError, KeyError) as e:
+                results[futures[future]] = None
+    
+    # Keep the original selection order for merging and warnings,
+    # naming each column after the component so shared series map to every name
+    for asset_name in assets:
+        series = results[FRED_SERIES[asset_name]]
+        if series is not None and not series.empty:
+            all_data.append(series.rename(asset_name))
+            if FRED_SERIES[asset_name] in cached_on:
+                stale_assets[asset_name] = cached_on[FRED_SERIES[asset_name]]
         else:
-            st.warning(f"Could not fetch data for {asset_name} (series: {series_id})")
+            failed_assets.append(asset_name)
+    
+    if not all_data:
+        raise PartialFetchError(None, failed_assets, stale_assets)
     
-    if successful_fetches == 0:
+    # Align all series on their date index in a single outer join
+    # Series arrive as float32; the astype is a no-op guard that keeps the block float32
+    display_data = pd.concat(all_data, axis=1, join='outer').sort_index().astype(np.float32)
+    display_data.ffill(inplace=True)
+    
+    # Convert from millions to billions for display - date stays the index, so this is one block op
+    display_data /= 1000.0
+    
+    if failed_assets or stale_assets:
+        raise PartialFetchError(display_data, failed_assets, stale_assets)
+    return display_data
+
+# Function to load the selected series, turning fetch failures into failed and stale components
+# Not cached itself - only complete, fresh results are cached (in build_display_data)
+def load_display_data(assets, start_date, api_key):
+    """Return (display_data, failed_assets, stale_assets) for the selected components"""
+    try:
+        return build_display_data(assets, start_date, api_key), [], {}
+    except PartialFetchError as e:
+        return e.display_data, e.failed_assets, e.stale_assets
+
+# Maximum number of points sent to the browser per chart trace,
+# applied once a trace is longer than DOWNSAMPLE_THRESHOLD points
+MAX_POINTS_PER_TRACE = 1000
+DOWNSAMPLE_THRESHOLD = 1500
+
+# Function to downsample a line trace for plotting
+def downsample_lttb(x, y, n_out=MAX_POINTS_PER_TRACE, threshold=DOWNSAMPLE_THRESHOLD):
+    """Largest-Triangle-Three-Buckets downsampling, returns (x, y) cut to n_out points if longer than threshold"""
+    x = np.asarray(x)
+    y = np.asarray(y)
+    
+    # Leading gaps (series that start later) are not drawn anyway
+    valid = ~np.isnan(y)
+    x, y = x[valid], y[valid]
+    n = len(y)
+    if n <= max(n_out, threshold) or n_out < 3:
+        return x, y
+    
+    # Triangle areas are computed in float64; the returned y keeps its dtype
+    xs = x.astype('int64').astype(float) if np.issubdtype(x.dtype, np.datetime64) else x.astype(float)
+    ys = y.astype(float)
+    
+    # First and last points are always kept; the rest is split into n_out - 2 buckets
+    edges = np.append(np.linspace(1, n - 1, n_out - 1).astype(int), n)
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    
+    prev = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Average point of the next bucket (the last bucket is just the final point)
+        next_x = xs[edges[i + 1]:edges[i + 2]].mean()
+        next_y = ys[edges[i + 1]:edges[i + 2]].mean()
+        # Keep the point forming the largest triangle with the previous pick and the next average
+        areas = np.abs(
+            (xs[prev] - next_x) * (ys[lo:hi] - ys[prev])
+            - (xs[prev] - xs[lo:hi]) * (next_y - ys[prev])
+        )
+        prev = lo + int(np.argmax(areas))
+        keep[i + 1] = prev
+    
+    return x[keep], y[keep]
+
+# Above this many weekly rows (~5 years) the composition chart is drawn monthly
+COMPOSITION_MONTHLY_THRESHOLD = 260
+
+# Function to express each column of a block as a percentage of a per-row total
+def pct_of_total(mat, total, out=None):
+    """Return mat / total * 100, written into out; rows with a zero total come out as 0"""
+    if out is None:
+        out = np.empty_like(mat)
+    # One reciprocal per row, then a single broadcast multiply into the output buffer
+    inv = np.divide(100.0, total, out=np.zeros_like(total), where=total != 0)
+    np.multiply(mat, inv[:, None], out=out)
+    return out
+
+# Fetch data
+with st.spinner("Fetching data from FRED..."):
+    display_data, failed_assets, stale_assets = load_display_data(tuple(selected_assets), start_date, api_key)
+    
+    # One combined warning rather than one element per failed series
+    if failed_assets:
+        failed_list = ", ".join(f"{asset_name} (series: {FRED_SERIES[asset_name]})" for asset_name in failed_assets)
+        st.warning(f"Could not fetch data for {failed_list}")
+    
+    # Series served from the disk cache because FRED couldn't be reached
+    if stale_assets:
+        stale_list = ", ".join(f"{asset_name} (cached {cached_on:%Y-%m-%d %H:%M})" for asset_name, cached_on in stale_assets.items())
+        st.warning(f"⚠️ FRED is unreachable - showing cached data for {stale_list}")
+    
+    if display_data is None:
         st.error("❌ Could not fetch any data. Please check your API key and try again.")
         st.stop()
     
-    # Merge all dataframes
-    fed_data = all_data[0]
-    for df in all_data[1:]:
-        fed_data = pd.merge(fed_data, df, on='date', how='outer')
+    successful_fetches = len(selected_assets) - len(failed_assets) - len(stale_assets)
     
-    fed_data = fed_data.sort_values('date').ffill()
+    # Selected components that actually loaded, in selection order - reused by every section
+    available_assets = tuple(asset for asset in selected_assets if asset in display_data.columns)
+
+# Display success message (the stale-data warning stands in for it when FRED was unreachable)
+if not stale_assets:
+    st.success(f"✅ Successfully loaded data for {successful_fetches} out of {len(selected_assets)} selected series")
+
+# Chart layouts, built once instead of through update_layout on every rerun
+MAIN_LAYOUT = dict(
+    height=500,
+    title="Federal Reserve Balance Sheet Components",
+    xaxis_title="Date",
+    yaxis_title="Amount (Billions of USD)",
+    hovermode='x unified',
+    legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+)
+
+GROWTH_LAYOUT = dict(
+    xaxis_title="Date",
+    yaxis_title="Growth Rate (%)"
+)
+
+FOREIGN_LAYOUT = dict(
+    title="Foreign Official Sector Activity",
+    xaxis_title="Date",
+    yaxis_title="Billions USD"
+)
+
+# Figure builders - cached with st.cache_resource so reruns that don't change the
+# plotted data reuse the same Figure object instead of rebuilding it
+@st.cache_resource(show_spinner=False, max_entries=8)
+def build_main_fig(display_data, assets):
+    """Main balance sheet chart, one downsampled WebGL trace per component"""
+    plot_dates = display_data.index.to_numpy('datetime64[ms]')
+    traces = []
+    
+    for asset in assets:
+        # WebGL trace with a bounded number of points, regardless of the date range
+        x_ds, y_ds = downsample_lttb(plot_dates, display_data[asset].to_numpy())
+        traces.append(go.Scattergl(
+            x=x_ds,
+            y=y_ds,
+            name=asset,
+            mode='lines',
+            hovertemplate='<b>%{x}</b><br>%{y:,.0f} billion<extra></extra>'
+        ))
+    
+    return go.Figure(data=traces, layout=MAIN_LAYOUT)
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def build_composition_fig(display_data):
+    """Stacked area of every component as a share of Total Assets (None if nothing to show)"""
+    other_cols = [col for col in display_data.columns if col != 'Total Assets']
+    if not other_cols:
+        return None
+    
+    # Monthly resolution is enough to show composition trends over long ranges -
+    # keep each month's last observation at its real date (resample would relabel it to month-end)
+    if len(display_data) > COMPOSITION_MONTHLY_THRESHOLD:
+        display_data = display_data.groupby(display_data.index.to_period('M')).tail(1)
+    
+    # float32 is plenty for percentages and halves the serialized payload
+    mat = display_data[other_cols].to_numpy(np.float32)
+    pct_df = pd.DataFrame(
+        pct_of_total(mat, display_data['Total Assets'].to_numpy(np.float32), out=np.empty_like(mat)),
+        index=display_data.index,
+        columns=other_cols
+    )
+    return px.area(
+        pct_df, 
+        x=pct_df.index, 
+        y=other_cols,
+        title="Balance Sheet Composition (%)",
+        labels={'value': 'Percentage', 'variable': 'Component'}
+    )
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def build_growth_fig(growth_series):
+    """Weekly and annual growth of a single component"""
+    plot_dates = growth_series.index.to_numpy('datetime64[ms]')
     
-    # Convert from millions to billions for display
-    display_data = fed_data.copy()
-    for col in display_data.columns:
-        if col != 'date':
-            display_data[col] = display_data[col] / 1000  # Convert to billions
+    # Only the selected series is passed in (and hashed), so only its growth rates are computed
+    weekly_x, weekly_y = downsample_lttb(plot_dates, (growth_series.pct_change() * 100).to_numpy())
+    annual_x, annual_y = downsample_lttb(plot_dates, (growth_series.pct_change(52) * 100).to_numpy())
     
-    # Create user-friendly column names
-    reverse_series_mapping = {v: k for k, v in FRED_SERIES.items()}
-    display_data = display_data.rename(columns=reverse_series_mapping)
+    return go.Figure(
+        data=[
+            go.Scattergl(
+                x=weekly_x,
+                y=weekly_y,
+                name="Weekly Growth (%)",
+                line=dict(color='blue')
+            ),
+            go.Scattergl(
+                x=annual_x,
+                y=annual_y,
+                name="Annual Growth (%)",
+                line=dict(color='red')
+            )
+        ],
+        layout=dict(GROWTH_LAYOUT, title=f"{growth_series.name} Growth Rates")
+    )
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def build_stress_fig(stress_data, title, threshold):
+    """Single stress indicator with a dashed threshold line"""
+    column = stress_data.columns[0]
+    fig = px.line(
+        stress_data, 
+        x=stress_data.index, 
+        y=column,
+        title=title,
+        labels={column: 'Billions USD'},
+        render_mode='webgl'
+    )
+    # Add stress threshold line and label in one layout update (same output as add_hline)
+    fig.update_layout(
+        shapes=[dict(type='line', xref='x domain', x0=0, x1=1, yref='y', y0=threshold, y1=threshold,
+                     line=dict(dash='dash', color='red'))],
+        annotations=[dict(text="Stress Threshold", xref='x domain', x=1, xanchor='right',
+                          yref='y', y=threshold, yanchor='top', showarrow=False)]
+    )
+    return fig
 
-# Display success message
-st.success(f"✅ Successfully loaded data for {successful_fetches} out of {len(selected_assets)} selected series")
+@st.cache_resource(show_spinner=False, max_entries=8)
+def build_foreign_fig(foreign_data):
+    """Foreign official sector series on one chart, downsampled like the main chart"""
+    plot_dates = foreign_data.index.to_numpy('datetime64[ms]')
+    traces = []
+    
+    for column in foreign_data.columns:
+        x_ds, y_ds = downsample_lttb(plot_dates, foreign_data[column].to_numpy())
+        traces.append(go.Scattergl(x=x_ds, y=y_ds, name=column, mode='lines'))
+    
+    return go.Figure(data=traces, layout=FOREIGN_LAYOUT)
 
 # Main dashboard layout
 col1, col2 = st.columns([2, 1])
@@ -181,26 +563,7 @@ with col1:
         """)
     
     # Create interactive chart
-    fig = go.Figure()
-    
-    for asset in selected_assets:
-        if asset in display_data.columns:
-            fig.add_trace(go.Scatter(
-                x=display_data['date'],
-                y=display_data[asset],
-                name=asset,
-                mode='lines',
-                hovertemplate='<b>%{x}</b><br>%{y:,.0f} billion<extra></extra>'
-            ))
-    
-    fig.update_layout(
-        height=500,
-        title="Federal Reserve Balance Sheet Components",
-        xaxis_title="Date",
-        yaxis_title="Amount (Billions of USD)",
-        hovermode='x unified',
-        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
-    )
+    fig = build_main_fig(display_data, available_assets)
     
     st.plotly_chart(fig, use_container_width=True)
 
@@ -209,31 +572,31 @@ with col2:
     
     # Latest values
     if len(display_data) > 1:
-        latest = display_data.iloc[-1]
-        prev = display_data.iloc[-2]
+        # Changes for all components in one vectorized step
+        prev_vals, latest_vals = display_data[list(available_assets)].tail(2).to_numpy()
+        changes = latest_vals - prev_vals
+        change_pcts = np.divide(changes * 100, prev_vals, out=np.zeros_like(changes), where=prev_vals != 0)
         
-        for asset in selected_assets:
-            if asset in display_data.columns:
-                current_val = latest[asset]
-                prev_val = prev[asset]
-                change = current_val - prev_val
-                change_pct = (change / prev_val * 100) if prev_val != 0 else 0
-                
-                # Color coding for metrics
-                delta_color = "normal"
-                if "Assets" in asset or "Securities" in asset or "Reserves" in asset:
-                    if change > 0:
-                        delta_color = "inverse"  # Green for increasing assets
-                elif "Loans" in asset or "Swaps" in asset:
-                    if change > 0:
-                        delta_color = "off"  # Red for increasing stress indicators
-                
-                st.metric(
-                    label=asset,
-                    value=f"${current_val:,.0f}B",
-                    delta=f"{change:+.1f}B ({change_pct:+.1f}%)",
-                    delta_color=delta_color
-                )
+        for i, asset in enumerate(available_assets):
+            current_val = latest_vals[i]
+            change = changes[i]
+            change_pct = change_pcts[i]
+            
+            # Color coding for metrics
+            delta_color = "normal"
+            if "Assets" in asset or "Securities" in asset or "Reserves" in asset:
+                if change > 0:
+                    delta_color = "inverse"  # Green for increasing assets
+            elif "Loans" in asset or "Swaps" in asset:
+                if change > 0:
+                    delta_color = "off"  # Red for increasing stress indicators
+            
+            st.metric(
+                label=asset,
+                value=f"${current_val:,.0f}B",
+                delta=f"{change:+.1f}B ({change_pct:+.1f}%)",
+                delta_color=delta_color
+            )
     else:
         st.warning("Insufficient data for metrics comparison")
     
@@ -261,9 +624,15 @@ with col2:
 # Additional analysis tabs
 st.subheader("Detailed Analysis")
 
-tab1, tab2, tab3, tab4 = st.tabs(["📊 Composition", "📈 Growth Rates", "⚡ Stress Indicators", "🌍 Foreign Sector"])
+# st.tabs runs every tab body on each rerun, so only build the view that is selected
+active_tab = st.radio(
+    "Analysis view",
+    ["📊 Composition", "📈 Growth Rates", "⚡ Stress Indicators", "🌍 Foreign Sector"],
+    horizontal=True,
+    label_visibility="collapsed"
+)
 
-with tab1:
+if active_tab == "📊 Composition":
     st.write("**Balance Sheet Composition Over Time**")
     
     with st.expander("🎯 Why composition matters"):
@@ -282,31 +651,16 @@ with tab1:
         """)
     
     if 'Total Assets' in display_data.columns:
-        # Calculate percentages
-        comp_data = display_data.copy()
-        for col in comp_data.columns:
-            if col != 'date' and col != 'Total Assets':
-                comp_data[f'{col}_pct'] = (comp_data[col] / comp_data['Total Assets']) * 100
-        
         # Composition chart
-        comp_cols = [col for col in comp_data.columns if '_pct' in col]
-        comp_names = [col.replace('_pct', '') for col in comp_cols]
-        
-        if comp_cols:
-            fig_comp = px.area(
-                comp_data, 
-                x='date', 
-                y=comp_cols,
-                title="Balance Sheet Composition (%)",
-                labels={'value': 'Percentage', 'variable': 'Component'}
-            )
+        fig_comp = build_composition_fig(display_data)
+        if fig_comp is not None:
             st.plotly_chart(fig_comp, use_container_width=True)
         else:
             st.warning("No composition data available")
     else:
         st.warning("Total Assets data needed for composition analysis")
 
-with tab2:
+elif active_tab == "📈 Growth Rates":
     st.write("**Weekly and Annual Growth Rates**")
     
     with st.expander("📖 Reading growth rates"):
@@ -324,45 +678,18 @@ with tab2:
         - Stress indicator growth = Problem severity
         """)
     
-    growth_data = display_data.copy()
-    for col in growth_data.columns:
-        if col != 'date':
-            growth_data[f'{col}_weekly_growth'] = growth_data[col].pct_change() * 100
-            growth_data[f'{col}_annual_growth'] = growth_data[col].pct_change(52) * 100
-    
     # Growth chart
-    available_assets = [asset for asset in selected_assets if asset in display_data.columns]
     if available_assets:
         growth_col = st.selectbox("Select series for growth analysis", available_assets)
         
         if growth_col in display_data.columns:
-            fig_growth = make_subplots(specs=[[{"secondary_y": False}]])
-            
-            fig_growth.add_trace(go.Scatter(
-                x=growth_data['date'],
-                y=growth_data[f'{growth_col}_weekly_growth'],
-                name="Weekly Growth (%)",
-                line=dict(color='blue')
-            ))
-            
-            fig_growth.add_trace(go.Scatter(
-                x=growth_data['date'],
-                y=growth_data[f'{growth_col}_annual_growth'],
-                name="Annual Growth (%)",
-                line=dict(color='red')
-            ))
-            
-            fig_growth.update_layout(
-                title=f"{growth_col} Growth Rates",
-                xaxis_title="Date",
-                yaxis_title="Growth Rate (%)"
-            )
+            fig_growth = build_growth_fig(display_data[growth_col])
             
             st.plotly_chart(fig_growth, use_container_width=True)
     else:
         st.warning("No data available for growth analysis")
 
-with tab3:
+elif active_tab == "⚡ Stress Indicators":
     st.write("**Market Stress Indicators**")
     
     with st.expander("🚨 Understanding stress indicators"):
@@ -395,38 +722,24 @@ with tab3:
         if 'Central Bank Liquidity Swaps' in stress_indicators:
             with col1:
                 # Liquidity swaps as stress indicator
-                fig_swaps = px.line(
-                    display_data, 
-                    x='date', 
-                    y='Central Bank Liquidity Swaps',
-                    title="Offshore Dollar Stress (Central Bank Liquidity Swaps)",
-                    labels={'Central Bank Liquidity Swaps': 'Billions USD'}
+                fig_swaps = build_stress_fig(
+                    display_data[['Central Bank Liquidity Swaps']],
+                    "Offshore Dollar Stress (Central Bank Liquidity Swaps)",
+                    100
                 )
-                # Add stress threshold line
-                fig_swaps.add_hline(y=100, line_dash="dash", line_color="red", 
-                                  annotation_text="Stress Threshold", annotation_position="bottom right")
                 st.plotly_chart(fig_swaps, use_container_width=True)
                 st.caption("Values above $100B indicate serious offshore dollar funding stress")
         
         if 'Loans' in stress_indicators:
             with col2:
                 # Loans as stress indicator
-                fig_loans = px.line(
-                    display_data, 
-                    x='date', 
-                    y='Loans',
-                    title="Domestic Credit Stress (Loans)",
-                    labels={'Loans': 'Billions USD'}
-                )
-                # Add stress threshold line
-                fig_loans.add_hline(y=50, line_dash="dash", line_color="red",
-                                  annotation_text="Stress Threshold", annotation_position="bottom right")
+                fig_loans = build_stress_fig(display_data[['Loans']], "Domestic Credit Stress (Loans)", 50)
                 st.plotly_chart(fig_loans, use_container_width=True)
                 st.caption("Values above $50B indicate domestic credit market stress")
     else:
         st.warning("Select 'Central Bank Liquidity Swaps' and/or 'Loans' to view stress indicators")
 
-with tab4:
+elif active_tab == "🌍 Foreign Sector":
     st.write("**Foreign Sector Activity**")
     
     with st.expander("🌎 Foreign sector signals"):
@@ -453,30 +766,23 @@ with tab4:
         foreign_metrics.append('Securities in Custody')
     
     if foreign_metrics:
-        fig_foreign = px.line(
-            display_data, 
-            x='date', 
-            y=foreign_metrics,
-            title="Foreign Official Sector Activity",
-            labels={'value': 'Billions USD'}
-        )
+        fig_foreign = build_foreign_fig(display_data[foreign_metrics])
         st.plotly_chart(fig_foreign, use_container_width=True)
         
         # Add specific insights based on current data
-        if len(display_data) > 0:
-            latest = display_data.iloc[-1]
-            if 'Reverse Repo Foreign' in latest:
-                repo_change = ""
-                if 'Reverse Repo Foreign' in display_data.columns and len(display_data) > 1:
-                    current_repo = latest['Reverse Repo Foreign']
-                    prev_repo = display_data.iloc[-2]['Reverse Repo Foreign']
-                    if current_repo < prev_repo:
-                        repo_change = "🔻 Decreasing - Foreign banks may be pulling cash"
-                    elif current_repo > prev_repo:
-                        repo_change = "🔺 Increasing - Foreign demand for USD safety"
-                
-                st.info(f"""
-                **Current Foreign Repo: ${latest.get('Reverse Repo Foreign', 0):.1f}B**
+        if len(display_data) > 0 and 'Reverse Repo Foreign' in display_data.columns:
+            repo_vals = display_data['Reverse Repo Foreign'].to_numpy()
+            current_repo = repo_vals[-1]
+            repo_change = ""
+            if len(repo_vals) > 1:
+                prev_repo = repo_vals[-2]
+                if current_repo < prev_repo:
+                    repo_change = "🔻 Decreasing - Foreign banks may be pulling cash"
+                elif current_repo > prev_repo:
+                    repo_change = "🔺 Increasing - Foreign demand for USD safety"
+            
+            st.info(f"""
+                **Current Foreign Repo: ${current_repo:.1f}B**
                 {repo_change}
                 """)
     else: